@@ -1,17 +1,69 @@
 import gi
 from gi.repository import GLib, Gio
 import os
-import shutil
+import shlex
 from datetime import datetime
 from .sub_utils.logging_util import get_logger
 
 logger = get_logger("action_handler")
 
+# Inside the Flatpak sandbox host apps are only reachable through flatpak-spawn
+_IN_FLATPAK = os.path.exists("/.flatpak-info")
+
 class ActionHandler:
     """Executes actions (Apps, Commands, Portals, MPRIS)"""
     
     def __init__(self, window_instance):
         self.window = window_instance
+        
+        # MPRIS state cache: bus name -> last known PlaybackStatus
+        # Kept up to date from DBus signals so the ring never blocks on a round-trip
+        self._mpris_players = {}
+        self._mpris_proxies = {} # bus name -> (proxy, g-properties-changed handler id)
+        self._session_bus = None
+        self._mpris_sub_id = 0
+        try:
+            # Already connected by GApplication, so this doesn't block
+            self._session_bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+            # Only MPRIS name changes are routed to us (arg0namespace match rule)
+            self._mpris_sub_id = self._session_bus.signal_subscribe(
+                "org.freedesktop.DBus", "org.freedesktop.DBus", "NameOwnerChanged",
+                "/org/freedesktop/DBus", "org.mpris.MediaPlayer2",
+                Gio.DBusSignalFlags.MATCH_ARG0_NAMESPACE,
+                self._on_mpris_name_owner_changed, None
+            )
+            # One-shot discovery of players that already exist
+            self._session_bus.call(
+                "org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus", "ListNames",
+                None, GLib.VariantType("(as)"), Gio.DBusCallFlags.NONE, -1, None,
+                self._on_list_names_ready, None
+            )
+        except Exception as e:
+            logger.error(f"Failed to watch MPRIS players: {e}")
+        
+        # Pre-split host argv per (type, action) so launches skip shell parsing
+        self._argv_cache = {}
+        # Resolved Gio.DesktopAppInfo per .desktop id when running unsandboxed, filled on launch
+        self._app_info_cache = {}
+        
+        # Screenshot portal proxy (created on first use) and pending Response subscription
+        self._screenshot_proxy = None
+        self._screenshot_sub_id = 0
+        # Screenshot destination; created on the first capture rather than at startup
+        pictures_dir = GLib.get_user_special_dir(GLib.UserDirectory.DIRECTORY_PICTURES) or GLib.get_home_dir()
+        self._screenshot_dir = os.path.join(pictures_dir, "Screenshots")
+        self._screenshot_dir_ready = False
+    
+    def shutdown(self):
+        """Drops the DBus subscriptions that would otherwise outlive the window"""
+        if self._mpris_sub_id:
+            self._session_bus.signal_unsubscribe(self._mpris_sub_id)
+            self._mpris_sub_id = 0
+        for proxy, handler_id in self._mpris_proxies.values():
+            proxy.disconnect(handler_id)
+        self._mpris_proxies.clear()
+        # Proxies still being created find their player gone and are dropped
+        self._mpris_players.clear()
     
     def execute(self, action_type, action):
         logger.info(f"Executing action: {action} (Type: {action_type})")
@@ -39,23 +91,64 @@ class ActionHandler:
             logger.info(f"Prefix action triggered: {action} (Placeholder)")
             self.window.animate_quit()
 
+    def prepare(self, action_type, action):
+        """Pre-computes launch data for an action so a click doesn't have to"""
+        # Only string parsing here: this runs for every slot before the first paint,
+        # so desktop file lookups are left to the launch itself
+        if action and action_type in ("command", "app"):
+            try:
+                self._host_argv(action_type, action)
+            except ValueError as e:
+                logger.warning(f"Could not parse action {action}: {e}")
+
+    def _desktop_app_info(self, action):
+        if _IN_FLATPAK or not action.endswith(".desktop"):
+            return None
+        app_info = self._app_info_cache.get(action)
+        if app_info is None:
+            # Misses aren't kept: the app may be installed while we're running
+            app_info = Gio.DesktopAppInfo.new(action)
+            if app_info:
+                self._app_info_cache[action] = app_info
+        return app_info
+
+    def _host_argv(self, action_type, action):
+        key = (action_type, action)
+        argv = self._argv_cache.get(key)
+        if argv is None:
+            if action_type == "app" and action.endswith(".desktop"):
+                argv = ["flatpak-spawn", "--host", "gtk-launch", action]
+            else:
+                argv = ["flatpak-spawn", "--host"] + shlex.split(action)
+            self._argv_cache[key] = argv
+        return argv
+
+    def _spawn(self, argv):
+        GLib.spawn_async(
+            argv=argv,
+            flags=GLib.SpawnFlags.SEARCH_PATH | GLib.SpawnFlags.STDOUT_TO_DEV_NULL | GLib.SpawnFlags.STDERR_TO_DEV_NULL
+        )
+
     def _run_host_command(self, cmd):
         try:
-            full_cmd = f"flatpak-spawn --host {cmd}"
-            GLib.spawn_command_line_async(full_cmd)
+            self._spawn(self._host_argv("command", cmd))
             self.window.animate_quit()
         except Exception as e:
             logger.error(f"Failed to run command {cmd}: {e}")
 
     def _launch_app(self, action):
         try:
-            if action.endswith(".desktop"):
-                full_cmd = f"flatpak-spawn --host gtk-launch {action}"
-            else:
-                full_cmd = f"flatpak-spawn --host {action}"
+            app_info = self._desktop_app_info(action)
+            if app_info:
+                # Launch directly instead of flatpak-spawn -> gtk-launch -> app
+                logger.info(f"Launching App: {action}")
+                app_info.launch([], None)
+                self.window.animate_quit()
+                return
             
-            logger.info(f"Executing App: {full_cmd}")
-            GLib.spawn_command_line_async(full_cmd)
+            argv = self._host_argv("app", action)
+            logger.info(f"Executing App: {argv}")
+            self._spawn(argv)
             self.window.animate_quit()
         except Exception as e:
             logger.error(f"Failed to launch app {action}: {e}")
@@ -96,10 +189,9 @@ class ActionHandler:
             logger.error(f"Failed to open file via Portal {path}: {e}")
             # Fallback to spawn if portal fails
             try:
-                quoted_path = f"'{path}'"
-                full_cmd = f"flatpak-spawn --host xdg-open {quoted_path}"
-                logger.info(f"Fallback: Opening file via spawn: {full_cmd}")
-                GLib.spawn_command_line_async(full_cmd)
+                argv = ["flatpak-spawn", "--host", "xdg-open", path]
+                logger.info(f"Fallback: Opening file via spawn: {argv}")
+                self._spawn(argv)
                 self.window.animate_quit()
             except Exception as e2:
                 logger.error(f"Fallback failed: {e2}")
@@ -109,62 +201,137 @@ class ActionHandler:
         self.handle_mpris_command("PlayPause")
         self.window.animate_quit()
 
-    def get_mpris_state(self):
-        """Returns True if any MPRIS player is 'Playing'"""
+    def _on_list_names_ready(self, bus, result, user_data):
+        if not self._mpris_sub_id:
+            return # shut down while the call was in flight
         try:
-            bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
-            names_variant = bus.call_sync("org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus", "ListNames", None, None, Gio.DBusCallFlags.NONE, -1, None)
-            mpris_players = [n for n in names_variant.get_child_value(0).unpack() if n.startswith("org.mpris.MediaPlayer2.")]
-            
-            for player in mpris_players:
-                reply = bus.call_sync(
-                    player, "/org/mpris/MediaPlayer2", "org.freedesktop.DBus.Properties", "Get",
-                    GLib.Variant("(ss)", ("org.mpris.MediaPlayer2.Player", "PlaybackStatus")),
-                    GLib.VariantType("(v)"), Gio.DBusCallFlags.NONE, -1, None
-                )
-                status = reply.get_child_value(0).get_variant().unpack()
-                if status == "Playing":
-                    return True
+            names = bus.call_finish(result).unpack()[0]
         except Exception as e:
-            logger.error(f"Failed to get MPRIS state: {e}")
-        return False
+            logger.error(f"Failed to list MPRIS players: {e}")
+            return
+        for name in names:
+            if name.startswith("org.mpris.MediaPlayer2."):
+                self._add_mpris_player(name)
+
+    def _on_mpris_name_owner_changed(self, connection, sender, path, interface, signal, params, user_data):
+        name, old_owner, new_owner = params.unpack()
+        if not name.startswith("org.mpris.MediaPlayer2."):
+            return
+        if new_owner:
+            self._add_mpris_player(name)
+        else:
+            self._remove_mpris_player(name)
+
+    def _add_mpris_player(self, name):
+        if name in self._mpris_players:
+            return
+        self._mpris_players[name] = None
+        Gio.DBusProxy.new_for_bus(
+            Gio.BusType.SESSION, Gio.DBusProxyFlags.GET_INVALIDATED_PROPERTIES, None,
+            name, "/org/mpris/MediaPlayer2", "org.mpris.MediaPlayer2.Player",
+            None, self._on_player_proxy_ready, name
+        )
+
+    def _remove_mpris_player(self, name):
+        was_playing = self._mpris_players.pop(name, None) == "Playing"
+        entry = self._mpris_proxies.pop(name, None)
+        if entry:
+            entry[0].disconnect(entry[1])
+        if was_playing:
+            self._notify_mpris_state_changed()
+
+    def _on_player_proxy_ready(self, source, result, name):
+        try:
+            proxy = Gio.DBusProxy.new_for_bus_finish(result)
+        except Exception as e:
+            logger.error(f"Failed to create MPRIS proxy for {name}: {e}")
+            return
+        if name not in self._mpris_players:
+            # Player vanished while the proxy was being created
+            return
+        handler_id = proxy.connect("g-properties-changed", self._on_player_properties_changed, name)
+        self._mpris_proxies[name] = (proxy, handler_id)
+        self._update_player_status(name, proxy)
+
+    def _on_player_properties_changed(self, proxy, changed, invalidated, name):
+        self._update_player_status(name, proxy)
+
+    def _update_player_status(self, name, proxy):
+        status_variant = proxy.get_cached_property("PlaybackStatus")
+        status = status_variant.unpack() if status_variant else None
+        if self._mpris_players.get(name) != status:
+            self._mpris_players[name] = status
+            self._notify_mpris_state_changed()
+
+    def _notify_mpris_state_changed(self):
+        if not self.window.is_quitting:
+            self.window._schedule_refresh()
+
+    def get_mpris_state(self):
+        """Returns True if any MPRIS player is 'Playing'"""
+        return any(s == "Playing" for s in self._mpris_players.values())
 
     def handle_mpris_command(self, cmd):
+        if cmd in ["PlayPause", "Next", "Previous", "Stop"]:
+            method, args = cmd, None
+        elif cmd == "Forward10":
+            method, args = "Seek", GLib.Variant("(x)", (10 * 1000000,))
+        elif cmd == "Backward10":
+            method, args = "Seek", GLib.Variant("(x)", (-10 * 1000000,))
+        else:
+            return
+        
         try:
-            bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
-            names_variant = bus.call_sync("org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus", "ListNames", None, None, Gio.DBusCallFlags.NONE, -1, None)
-            mpris_players = [n for n in names_variant.get_child_value(0).unpack() if n.startswith("org.mpris.MediaPlayer2.")]
-            
-            for player in mpris_players:
-                if cmd in ["PlayPause", "Next", "Previous", "Stop"]:
-                    bus.call(player, "/org/mpris/MediaPlayer2", "org.mpris.MediaPlayer2.Player", cmd, None, None, Gio.DBusCallFlags.NONE, -1, None, None)
-                elif cmd == "Forward10":
-                    bus.call(player, "/org/mpris/MediaPlayer2", "org.mpris.MediaPlayer2.Player", "Seek", GLib.Variant("(x)", (10 * 1000000,)), None, Gio.DBusCallFlags.NONE, -1, None, None)
-                elif cmd == "Backward10":
-                    bus.call(player, "/org/mpris/MediaPlayer2", "org.mpris.MediaPlayer2.Player", "Seek", GLib.Variant("(x)", (-10 * 1000000,)), None, Gio.DBusCallFlags.NONE, -1, None, None)
+            bus = self._session_bus
+            for player in list(self._mpris_players):
+                # Don't wake up activatable players that aren't running
+                bus.call(player, "/org/mpris/MediaPlayer2", "org.mpris.MediaPlayer2.Player", method, args, None, Gio.DBusCallFlags.NO_AUTO_START, -1, None, None)
+            # Push all queued calls out in one go
+            bus.flush(None, None, None)
         except Exception as e:
             logger.error(f"MPRIS command {cmd} failed: {e}")
 
     # --- Portal Logic ---
     def handle_files_portal(self):
         try:
-            full_cmd = "flatpak-spawn --host xdg-open ."
-            logger.info(f"Executing: {full_cmd}")
-            GLib.spawn_command_line_async(full_cmd)
+            argv = ["flatpak-spawn", "--host", "xdg-open", "."]
+            logger.info(f"Executing: {argv}")
+            self._spawn(argv)
             self.window.animate_quit()
         except Exception as e:
             logger.error(f"Files action failed: {e}")
 
+    def _get_screenshot_proxy(self):
+        if self._screenshot_proxy is None:
+            self._screenshot_proxy = Gio.DBusProxy.new_for_bus_sync(
+                Gio.BusType.SESSION,
+                Gio.DBusProxyFlags.DO_NOT_LOAD_PROPERTIES | Gio.DBusProxyFlags.DO_NOT_CONNECT_SIGNALS,
+                None,
+                "org.freedesktop.portal.Desktop",
+                "/org/freedesktop/portal/desktop",
+                "org.freedesktop.portal.Screenshot",
+                None
+            )
+        return self._screenshot_proxy
+
+    def _unsubscribe_screenshot_response(self, bus):
+        if self._screenshot_sub_id:
+            bus.signal_unsubscribe(self._screenshot_sub_id)
+            self._screenshot_sub_id = 0
+
     def handle_screenshot_portal(self, mode="full"):
         try:
             interactive = mode in ["area", "window"]
-            bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+            proxy = self._get_screenshot_proxy()
+            bus = proxy.get_connection()
             timestamp = int(GLib.get_real_time() / 1000)
             token = f"quickey_screenshot_{timestamp}"
             sender = bus.get_unique_name().replace(".", "_").replace(":", "")
             handle_path = f"/org/freedesktop/portal/desktop/request/{sender}/{token}"
             
-            bus.signal_subscribe(
+            # Subscribe before calling so the Response can't be missed; drop any stale match rule
+            self._unsubscribe_screenshot_response(bus)
+            self._screenshot_sub_id = bus.signal_subscribe(
                 "org.freedesktop.portal.Desktop", "org.freedesktop.portal.Request", "Response",
                 handle_path, None, Gio.DBusSignalFlags.NONE,
                 self._on_screenshot_response, None
@@ -178,32 +345,55 @@ class ActionHandler:
             # Hide window immediately
             self.window.set_visible(False)
             
-            bus.call(
-                "org.freedesktop.portal.Desktop", "/org/freedesktop/portal/desktop",
-                "org.freedesktop.portal.Screenshot", "Screenshot",
+            proxy.call(
+                "Screenshot",
                 GLib.Variant("(sa{sv})", ("", options)),
-                None, Gio.DBusCallFlags.NONE, -1, None, None
+                Gio.DBusCallFlags.NONE, -1, None,
+                self._on_screenshot_called, None
             )
         except Exception as e:
             logger.error(f"Screenshot request failed: {e}")
             self.window.animate_quit()
         return False
 
+    def _on_screenshot_called(self, proxy, result, user_data):
+        try:
+            proxy.call_finish(result)
+        except Exception as e:
+            logger.error(f"Screenshot request failed: {e}")
+            self._unsubscribe_screenshot_response(proxy.get_connection())
+            self.window.animate_quit()
+
     def _on_screenshot_response(self, connection, sender, path, interface, signal, params, user_data):
+        self._unsubscribe_screenshot_response(connection)
         try:
             response_code, results = params.unpack()
             if response_code == 0 and "uri" in results:
                 uri = results["uri"]
                 src_path = uri.replace("file://", "")
                 if os.path.exists(src_path):
-                    btn_pictures = GLib.get_user_special_dir(GLib.UserDirectory.DIRECTORY_PICTURES)
-                    save_dir = os.path.join(btn_pictures, "Screenshots")
-                    os.makedirs(save_dir, exist_ok=True)
+                    if not self._screenshot_dir_ready:
+                        os.makedirs(self._screenshot_dir, exist_ok=True)
+                        self._screenshot_dir_ready = True
                     filename = datetime.now().strftime("Screenshot from %Y-%m-%d %H-%M-%S.png")
-                    dest_path = os.path.join(save_dir, filename)
-                    shutil.copy(src_path, dest_path)
-                    logger.info(f"Saved screenshot to: {dest_path}")
+                    dest_path = os.path.join(self._screenshot_dir, filename)
+                    # Copy off the main loop; quit once the copy has finished
+                    Gio.File.new_for_path(src_path).copy_async(
+                        Gio.File.new_for_path(dest_path), Gio.FileCopyFlags.OVERWRITE,
+                        GLib.PRIORITY_DEFAULT, None, None, None,
+                        self._on_screenshot_copied, dest_path
+                    )
+                    return
         except Exception as e:
             logger.error(f"Error handling screenshot response: {e}")
         
         self.window.animate_quit(should_quit_app=True)
+
+    def _on_screenshot_copied(self, src, result, dest_path):
+        try:
+            src.copy_finish(result)
+            logger.info(f"Saved screenshot to: {dest_path}")
+        except Exception as e:
+            logger.error(f"Failed to save screenshot to {dest_path}: {e}")
+        
+        self.window.animate_quit(should_quit_app=True)
@@ -5,15 +5,22 @@ from .sub_utils.logging_util import get_logger
 
 logger = get_logger("config_manager")
 
+_EMPTY_SLOT = {"name": "Empty", "icon": "list-add-symbolic", "type": "empty", "action": ""}
+
 class ConfigManager:
     """Handles GSettings and Button Configuration Logic"""
     
     def __init__(self, settings: Gio.Settings):
         self.settings = settings
+        # (raw json string, normalized list) of the last parse/save
+        self._buttons_cache = (None, None)
         
     def load_configured_buttons(self):
         """Loads and normalizes button configuration from GSettings"""
         json_str = self.settings.get_string("buttons-json")
+        if json_str == self._buttons_cache[0]:
+            return list(self._buttons_cache[1])
+        
         try:
             buttons = json.loads(json_str)
         except Exception:
@@ -24,20 +31,14 @@ class ConfigManager:
              logger.warning("Loaded buttons data is invalid or empty. Using empty list.")
              buttons = []
 
-        # Ensure we have exactly 8 slots
-        final_buttons = [None] * 8
-        
-        # Fill with saved config
-        for i, btn in enumerate(buttons):
-            if i < 8:
-                final_buttons[i] = btn
-
-        # Normalize and Fill Empty Slots
-        for i in range(8):
-            if not final_buttons[i]:
+        # Ensure we have exactly 8 slots, filling gaps and missing ones with Empty
+        final_buttons = buttons[:8] + [None] * (8 - min(len(buttons), 8))
+        for i, btn in enumerate(final_buttons):
+            if not btn:
                 final_buttons[i] = self._create_empty_slot()
-                
-        return final_buttons
+        
+        self._buttons_cache = (json_str, final_buttons)
+        return list(final_buttons)
 
     def save_buttons(self, buttons):
         """Saves values to GSettings"""
@@ -49,6 +50,8 @@ class ConfigManager:
             
             json_str = json.dumps(buttons)
             self.settings.set_string("buttons-json", json_str)
+            # Saved list is already normalized; no need to parse it back on changed::
+            self._buttons_cache = (json_str, list(buttons))
             logger.info("Button configuration saved.")
         except Exception as e:
             logger.error(f"Failed to save buttons: {e}")
@@ -66,4 +69,5 @@ class ConfigManager:
         self.settings.reset("buttons-json")
 
     def _create_empty_slot(self):
-        return {"name": "Empty", "icon": "list-add-symbolic", "type": "empty", "action": ""}
+        # Slot dicts are edited in place by the preferences rows, so never share one
+        return dict(_EMPTY_SLOT)
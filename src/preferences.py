@@ -665,15 +665,21 @@ class ActionPicker(Gtk.Dialog):
         # Result placeholder
         self.result = None
         
+        # Last (raw, normalized) search query, reused when the toggle re-triggers a populate
+        self._last_query_raw = None
+        self._last_query_lc = ""
+        
         # Load Actions
         self.all_actions = AppScanner.get_all_actions()
         
         # Calculate required width based on longest name to prevent expansion
+        # Subtitles are also built once here so PickerRow doesn't rebuild them per populate
         max_len = 0
         for action in self.all_actions:
             name_len = len(action.get("name", ""))
             if name_len > max_len:
                 max_len = name_len
+            action["_subtitle"] = self._build_subtitle(action)
                 
         # Estimate width: (Chars * ~7px) + Icon(32) + Margins(~50) + Buffer
         # Default min 400, cap at reasonable screen width (e.g. 600)
@@ -687,11 +693,45 @@ class ActionPicker(Gtk.Dialog):
         self.show_all()
 
 
+    def reset(self, excluded_actions=None):
+        """Clears the search, toggle and result of a kept dialog and re-filters its rows.
+
+        The installed apps scanned when the dialog was built are reused, not rescanned.
+        """
+        self.excluded_actions = excluded_actions or []
+        self.result = None
+        self.custom_entry.set_text("")
+        
+        # Repopulate once below instead of once per reset widget
+        self.hidden_toggle.handler_block_by_func(self._on_toggle_changed)
+        self.hidden_toggle.set_active(False)
+        self.hidden_toggle.handler_unblock_by_func(self._on_toggle_changed)
+        self.search_entry.handler_block_by_func(self._on_search_changed)
+        self.search_entry.set_text("")
+        self.search_entry.handler_unblock_by_func(self._on_search_changed)
+        
+        self._populate_list("")
+
+    @staticmethod
+    def _build_subtitle(action):
+        tags = " • ".join([tag for tag in (
+            "Flatpak" if action.get("is_flatpak") else None,
+            "Hidden" if action.get("hidden") else None
+        ) if tag])
+        desc = action.get("desc", "")
+        if tags:
+            return f"{tags} | {desc}" if desc else tags
+        return desc
+
     def _populate_list(self, query):
         for child in self.listbox.get_children():
             self.listbox.remove(child)
             
-        query = query.lower().strip()
+        if query == self._last_query_raw:
+            query = self._last_query_lc
+        else:
+            self._last_query_raw = query
+            query = self._last_query_lc = query.lower().strip()
         show_hidden = self.hidden_toggle.get_active()
         count = 0
         for action in self.all_actions:
@@ -735,7 +775,8 @@ class ActionPicker(Gtk.Dialog):
         self._populate_list(self.search_entry.get_text())
 
     def _on_row_activated(self, listbox, row):
-        self.result = row.action_data
+        # Strip cached private keys (e.g. _subtitle) so they don't end up in buttons-json
+        self.result = {k: v for k, v in row.action_data.items() if not k.startswith("_")}
         self.response(Gtk.ResponseType.OK)
 
     def _on_custom_activate(self, widget):
@@ -773,18 +814,8 @@ class PickerRow(Gtk.ListBoxRow):
         name_lbl.set_ellipsize(Pango.EllipsizeMode.END)
         lbl_box.pack_start(name_lbl, False, False, 0)
         
-        # Build subtitle
-        sub_items = []
-        if action_data.get("is_flatpak"):
-            sub_items.append("Flatpak")
-        if action_data.get("hidden"):
-            sub_items.append("Hidden")
-        
-        desc = action_data.get("desc", "")
-        if sub_items:
-            prefix = " • ".join(sub_items)
-            desc = f"{prefix} | {desc}" if desc else prefix
-            
+        # Subtitle is precomputed by ActionPicker
+        desc = action_data.get("_subtitle", "")
         if desc:
             desc_lbl = Gtk.Label(label=desc)
             desc_lbl.set_xalign(0)
@@ -4,6 +4,7 @@ import json
 import os
 import shutil
 import gc
+import functools
 from datetime import datetime
 import gi
 gi.require_version('Handy', '1')
@@ -14,22 +15,63 @@ from .mode_switch import ModeSwitch
 from .sub_utils.logging_util import get_logger, log_function_calls
 from .config_manager import ConfigManager
 from .action_handler import ActionHandler
-from .preferences import ActionPicker
+from .preferences import ActionPicker, PreferencesWindow
 
 logger = get_logger("window")
 
+# Set QUICKEY_TRACE_POS to log where the WM actually placed the window after each move
+_TRACE_POS = bool(os.environ.get("QUICKEY_TRACE_POS"))
+
+def _angle_geom(angle):
+    """Returns (cos, sin, whole degrees in [0, 360)) for an angle in radians"""
+    deg = round(math.degrees(angle % (2 * math.pi))) % 360
+    return (math.cos(angle), math.sin(angle), deg)
+
+# Ring geometry is constant: 8 slots 45 degrees apart, starting at 12 o'clock.
+# Computed once and shared by every layout path.
+_SLOT_ANGLES = tuple(i * (math.pi / 4) - math.pi / 2 for i in range(8))
+_SLOT_GEOM = tuple(_angle_geom(a) for a in _SLOT_ANGLES)
+
+# The ring window is a fixed square, centred on the pointer
+_WINDOW_SIZE = 600
+_WINDOW_HALF = _WINDOW_SIZE // 2
+
+_SUB_RADIUS = 160
+_SUB_SPACING = 20 # Degrees between sub-buttons
+
+@functools.lru_cache(maxsize=None)
+def _sub_button_geom(index, count):
+    """Centers and label geometry for `count` sub-buttons fanned around slot `index`"""
+    start_offset = -(count - 1) * _SUB_SPACING / 2
+    result = []
+    for j in range(count):
+        sa = _SLOT_ANGLES[index] + math.radians(start_offset + j * _SUB_SPACING)
+        geom = _angle_geom(sa)
+        result.append((_WINDOW_HALF + _SUB_RADIUS * geom[0], _WINDOW_HALF + _SUB_RADIUS * geom[1], geom))
+    return tuple(result)
+
 class quickeyWindow(Handy.ApplicationWindow):
     __gtype_name__ = 'quickeyWindow'
 
+    # Transparent background for the pointer sync window, parsed on first use
+    _sync_css_provider = None
+
     Handy.init()
 
     @log_function_calls
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        logger.info(f"Initializing quickeyWindow as Ring Menu. Backend: {Gdk.Screen.get_default().get_display().get_name()}")
+        logger.info("Initializing quickeyWindow as Ring Menu. Backend: %s", Gdk.Screen.get_default().get_display().get_name())
 
         self.app = self.props.application
         self.is_quitting = False
+        self._refresh_pending = False
+        self._restore_source = 0
+        self._reposition_pending = False
+        self._monitor_rects = None # [(x, y, width, height)] per monitor, dropped on monitors-changed
+        self._action_picker = None # created on first open_action_picker
+        self._placed_pos = None # last position passed to move()
+        self._configure_handler_id = None # set while WM placement fixups are pending
         
         # Initialize Logic Handlers
         self.config_manager = ConfigManager(self.app.gio_settings)
@@ -49,10 +91,21 @@ class quickeyWindow(Handy.ApplicationWindow):
         self.stick() 
         self.set_focus_on_map(True)
 
-        self.props.default_width = 600
-        self.props.default_height = 600
+        self.props.default_width = _WINDOW_SIZE
+        self.props.default_height = _WINDOW_SIZE
+        
+        # Display and pointer used on every reposition; the pointer is re-resolved
+        # only if the display's seats change
+        self._display = Gdk.Display.get_default()
+        self._is_x11 = self._display.__gtype__.name == "GdkX11Display"
+        self._update_pointer()
+        self._display_handler_ids = (
+            self._display.connect("seat-added", self._update_pointer),
+            self._display.connect("seat-removed", self._update_pointer),
+        )
         
-        screen = self.get_screen()
+        screen = self._screen = self.get_screen()
+        self._screen_handler_id = screen.connect("monitors-changed", self._on_monitors_changed)
         visual = screen.get_rgba_visual()
         if visual:
             self.set_visual(visual)
@@ -68,19 +121,32 @@ class quickeyWindow(Handy.ApplicationWindow):
         self.radius = 100 # Increased from 80
         self.setup_ring_menu()
         
-        self.add(self.overlay)
+        # Clicks that no ring widget handles land on this event box and dismiss the ring
+        self.click_catcher = Gtk.EventBox()
+        self.click_catcher.set_visible_window(False)
+        self.click_catcher.add_events(Gdk.EventMask.BUTTON_PRESS_MASK)
+        self.click_catcher.connect("button-press-event", self._on_button_press)
+        self.click_catcher.add(self.overlay)
+        self.add(self.click_catcher)
         
         # Connect signals for initial positioning
         self.map_handler_id = self.connect("map-event", self._on_map_event)
         self.draw_handler_id = self.connect("draw", self._on_draw_event)
         
         # Focus/Click tracking
-        self.add_events(Gdk.EventMask.FOCUS_CHANGE_MASK | Gdk.EventMask.BUTTON_PRESS_MASK)
+        self.add_events(Gdk.EventMask.FOCUS_CHANGE_MASK)
         self.connect("focus-out-event", self._on_focus_out)
-        self.connect("button-press-event", self._on_button_press)
+        
+        # Track whether Preferences is open instead of scanning windows on every focus-out
+        self._has_preferences = any(isinstance(w, PreferencesWindow) for w in self.app.get_windows())
+        self._app_handler_ids = (
+            self.app.connect("window-added", self._on_app_windows_changed),
+            self.app.connect("window-removed", self._on_app_windows_changed),
+        )
+        self.connect("destroy", self._on_destroy)
 
-        # Initial target setup (default to center if triggered during init)
-        self.target_x = self.target_y = 0
+        # Pointer target, known once _finalize_reposition has run
+        self.target_x = self.target_y = None
         
         # Real-time settings sync: Refresh ring when buttons-json changes
         self.app.gio_settings.connect("changed::buttons-json", self._on_settings_buttons_changed)
@@ -89,7 +155,18 @@ class quickeyWindow(Handy.ApplicationWindow):
 
     def _on_settings_buttons_changed(self, settings, key):
         logger.info("Settings changed: refreshing ring menu buttons")
-        GLib.idle_add(self.refresh_all_ring_buttons)
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        # Collapse bursts of refresh requests into a single idle pass
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            GLib.idle_add(self._do_refresh, priority=GLib.PRIORITY_DEFAULT_IDLE)
+
+    def _do_refresh(self):
+        self._refresh_pending = False
+        self.refresh_all_ring_buttons()
+        return False
 
     def load_configured_buttons(self):
         return self.config_manager.load_configured_buttons()
@@ -103,56 +180,81 @@ class quickeyWindow(Handy.ApplicationWindow):
         btn = self.ring_buttons[index]
         label_data = self.all_label_data[index]
         
-        # 0. Rebuild Sub-buttons structure
-        self._rebuild_sub_buttons(index, data)
+        is_media = data.get("action") == "media"
+        is_playing = self.action_handler.get_mpris_state() if is_media else None
+        
+        # Skip no-op refreshes (unchanged slot and, for media, unchanged playback state)
+        if data == getattr(btn, '_action_data', None) and is_playing == getattr(btn, '_is_playing', None):
+            return
+        
+        # 0. Rebuild Sub-buttons structure only if the sub-button set can have changed.
+        # Slots that were never hovered have no sub-buttons yet; on_btn_enter builds them.
+        subs_key = (data.get("action"), data.get("sub_buttons"))
+        subs_changed = subs_key != getattr(btn, '_prev_subs_key', None) and label_data['sd_built']
+        if subs_changed:
+            self._rebuild_sub_buttons(index, data)
+        btn._prev_subs_key = subs_key
         
         icon_name = data.get("icon", "system-run-symbolic")
         
         # Dynamic Media Icon
-        if data.get("action") == "media":
-            is_playing = self.action_handler.get_mpris_state()
+        if is_media:
             icon_name = "media-playback-pause" if is_playing else "media-playback-start"
         
-        img = Gtk.Image.new_from_icon_name(icon_name, Gtk.IconSize.MENU)
-        img.set_pixel_size(24)
-        btn.set_image(img)
+        self._set_button_icon(btn, icon_name, 24)
         btn._action_data = data
-        
-        # Update label text
-        label_data['lb'].get_children()[0].set_text(data.get("name", "Empty"))
-
-        if data.get("type") == "empty" or index == 7:
-            pass
-        else:
-            pass
-
-        # Recalculate label position
-        lb = label_data['lb']
-        lb.show_all()
-        
-        _, nw = lb.get_preferred_width()
-        _, nh = lb.get_preferred_height()
-        
-        angle = (index * (360 / 8) - 90) * (math.pi / 180)
+        btn._is_playing = is_playing
+        self.action_handler.prepare(data.get("type"), data.get("action"))
         
         # Position label further out if there are sub-buttons
         # Main Radius 100. Sub radius 160 + sub size 15 + desired gap 15 = 190
         # _get_label_pos uses: base_radius(100) + button_radius(24) + gap
         # 100 + 24 + 66 = 190. Perfect 15px gap from satellite edge.
-        gap = 66 if len(label_data.get('sd', [])) > 0 else 15
-        pos = self._get_label_pos(nw, nh, angle, self.radius, gap=gap, button_radius=24) 
-        self.fixed.move(lb, pos[0], pos[1])
+        gap = 66 if self._has_sub_actions(data) else 15
         
-        # Also reposition sub-button labels if any
-        for sl_data in label_data.get('sl', []):
+        # Update label text and recalculate its position only when text or gap changed
+        lb = label_data['lb']
+        lbl = lb._label
+        text = data.get("name", "Empty")
+        if text != lbl.get_text() or gap != label_data.get('gap'):
+            lbl.set_text(text)
+            label_data['gap'] = gap
+            
+            # Before the first map, reposition_all_labels measures everything once CSS is resolved
+            if self._labels_placed:
+                nw, nh = self._measure_label(lb, text)
+                
+                pos = self._get_label_pos(nw, nh, *_SLOT_GEOM[index], self.radius, gap=gap, button_radius=24) 
+                self._move_child(lb, pos[0], pos[1])
+
+    def _sub_label_moves(self, label_data):
+        moves = []
+        for sl_data in label_data['sl']:
             slb = sl_data['lb']
-            slb.show_all()
-            _, snw = slb.get_preferred_width()
-            _, snh = slb.get_preferred_height()
-            s_angle = sl_data['angle']
+            snw, snh = self._measure_label(slb, sl_data['text'])
             # Sub labels at 190px total distance.
-            s_pos = self._get_label_pos(snw, snh, s_angle, self.radius, gap=66, button_radius=24)
-            self.fixed.move(slb, s_pos[0], s_pos[1])
+            s_pos = self._get_label_pos(snw, snh, *sl_data['geom'], self.radius, gap=66, button_radius=24)
+            moves.append((slb, s_pos[0], s_pos[1]))
+        return moves
+
+    def _put_sub_label(self, slb, text, geom):
+        # Labels only get their #quickey-window CSS once parented, so a text that has not
+        # been measured yet must be put first; a known size goes straight to its spot
+        size = self._label_size_cache.get(text) if self._labels_placed else None
+        if size is None:
+            self._put_child(slb, 0, 0)
+            if not self._labels_placed:
+                return # reposition_all_labels places it once CSS is resolved
+            size = self._measure_label(slb, text)
+        x, y = self._get_label_pos(*size, *geom, self.radius, gap=66, button_radius=24)
+        if hasattr(slb, '_fixed_pos'):
+            self._move_child(slb, x, y)
+        else:
+            self._put_child(slb, x, y)
+
+    def _position_sub_labels(self, label_data):
+        for slb, x, y in self._sub_label_moves(label_data):
+            self._move_child(slb, x, y)
     
     def on_button_clicked(self, button, data=None):
         if data is None:
@@ -188,7 +290,13 @@ class quickeyWindow(Handy.ApplicationWindow):
             if act in singletons:
                 excluded.append(act)
 
-        picker = ActionPicker(self, excluded_actions=excluded)
+        # The picker is kept between runs; building it scans every installed app
+        picker = self._action_picker
+        if picker is None:
+            picker = self._action_picker = ActionPicker(self, excluded_actions=excluded)
+            picker.set_destroy_with_parent(True)
+        else:
+            picker.reset(excluded)
         if picker.run() == Gtk.ResponseType.OK:
             result = picker.get_result()
             if result:
@@ -197,20 +305,23 @@ class quickeyWindow(Handy.ApplicationWindow):
                 buttons = self.config_manager.load_configured_buttons()
                 buttons[index] = result
                 self.config_manager.save_buttons(buttons)
-                self.refresh_all_ring_buttons()
-        picker.destroy()
+                self._schedule_refresh()
+        picker.hide()
         
         self.is_configuring = False
         self.set_keep_above(True)
 
-    def on_sub_button_clicked(self, widget, data):
+    def on_sub_button_clicked(self, widget, data=None):
+        if data is None:
+            data = getattr(widget, "_sub_data", {})
+        
         action = data.get("action")
         logger.info(f"Sub-button clicked: {action}")
         
         # Built-in MPRIS overrides for specialized behavior
         if action in ["Previous", "Next", "Backward10", "Forward10", "PlayPause", "Stop"]:
             self.action_handler.handle_mpris_command(action)
-            self.refresh_all_ring_buttons()
+            self._schedule_refresh()
             return
             
         if "screenshot" in action:
@@ -235,15 +346,21 @@ class quickeyWindow(Handy.ApplicationWindow):
         for i, data in enumerate(items_data):
             self.refresh_button_ui(i, data)
 
-    def _get_label_pos(self, nw, nh, angle, base_radius, gap=15, button_radius=24):
-        center_x = 300
-        center_y = 300
-        
-        # Normalize angle for easier checks
-        norm_angle = angle % (2 * math.pi)
-        deg = round(math.degrees(norm_angle)) % 360
-        
-        dx, dy = math.cos(angle), math.sin(angle)
+    def _measure_label(self, lb, text):
+        # Preferred sizes only depend on the text (all labels share the same CSS)
+        size = self._label_size_cache.get(text)
+        if size is None:
+            _, nw = lb.get_preferred_width()
+            _, nh = lb.get_preferred_height()
+            size = (nw, nh)
+            # A hidden label is left out of the box's size; don't keep that
+            if lb._label.get_visible():
+                self._label_size_cache[text] = size
+        return size
+
+    def _get_label_pos(self, nw, nh, dx, dy, deg, base_radius, gap=15, button_radius=24):
+        center_x = _WINDOW_HALF
+        center_y = _WINDOW_HALF
         
         # Button center
         bx = center_x + base_radius * dx
@@ -265,51 +382,102 @@ class quickeyWindow(Handy.ApplicationWindow):
             
         return (int(round(lx)), int(round(ly)))
 
+    def _put_child(self, widget, x, y):
+        self.fixed.put(widget, x, y)
+        widget._fixed_pos = (x, y)
+
+    def _move_child(self, widget, x, y):
+        # Gtk.Fixed.move queues a resize even when the position is unchanged
+        if widget._fixed_pos != (x, y):
+            widget._fixed_pos = (x, y)
+            self.fixed.move(widget, x, y)
+
+    def _icon_surface(self, icon_name, size):
+        key = (icon_name, size)
+        surface = self._icon_cache.get(key)
+        if surface is None:
+            try:
+                surface = self._icon_theme.load_surface(
+                    icon_name, size, self.get_scale_factor(), None, Gtk.IconLookupFlags.FORCE_SIZE) or False
+            except GLib.Error:
+                surface = False
+            self._icon_cache[key] = surface
+        return surface
+
+    def _set_button_icon(self, button, icon_name, size):
+        # Reuse the button's image; refreshes (e.g. MPRIS play/pause) only swap its contents
+        img = button.get_image()
+        if img is None:
+            img = Gtk.Image()
+            button.set_image(img)
+        elif img._icon_key == (icon_name, size):
+            return
+        img._icon_key = (icon_name, size)
+        
+        # Symbolic icons are recoloured from the button's CSS colour when drawn, which a
+        # pre-rendered surface would lose; GtkIconTheme caches those lookups itself
+        if not icon_name.endswith("-symbolic"):
+            surface = self._icon_surface(icon_name, size)
+            if surface:
+                img.set_from_surface(surface)
+                return
+        # Symbolic, or not resolvable up front (e.g. a file path); let GtkImage handle it
+        img.set_from_icon_name(icon_name, Gtk.IconSize.MENU)
+        img.set_pixel_size(size)
+
+    def _on_icon_theme_changed(self, *args):
+        self._icon_cache.clear()
+        # Re-render every icon; their unchanged keys would otherwise skip the update
+        buttons = list(self.ring_buttons)
+        for label_data in self.all_label_data:
+            buttons.extend(label_data['sd'])
+        for button in buttons:
+            img = button.get_image()
+            key = getattr(img, '_icon_key', None)
+            if key is not None:
+                img._icon_key = None
+                self._set_button_icon(button, *key)
+
     def _create_label(self, text):
         lb = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
-        lb.get_style_context().add_class("label-box")
+        lb._sctx = lb.get_style_context()
+        lb._sctx.add_class("label-box")
         lbl = Gtk.Label(text)
         lbl.set_xalign(0.5)
         lbl.set_halign(Gtk.Align.CENTER)
         lb.add(lbl)
+        lb._label = lbl
         return lb
 
     def reposition_all_labels(self):
         """Final positioning pass after window is mapped and CSS is applied"""
         logger.info("Repositioning all labels after map event...")
+        # Measure now that CSS is definitely resolved
+        self._label_size_cache.clear()
+        self._labels_placed = True
+        # Measure everything first, then move: a move queues a resize on the Fixed,
+        # and interleaving it with size requests makes each measurement redo that work
+        moves = []
         for i, label_data in enumerate(self.all_label_data):
             lb = label_data['lb']
-            # Re-measure now that CSS is definitely resolved
-            _, nw = lb.get_preferred_width()
-            _, nh = lb.get_preferred_height()
+            nw, nh = self._measure_label(lb, lb._label.get_text())
             
-            angle = (i * (360 / 8) - 90) * (math.pi / 180)
-            gap = 66 if len(label_data.get('sd', [])) > 0 else 15
-            pos = self._get_label_pos(nw, nh, angle, self.radius, gap=gap, button_radius=24)
-            self.fixed.move(lb, pos[0], pos[1])
-            
-            for sl_data in label_data.get('sl', []):
-                slb = sl_data['lb']
-                _, snw = slb.get_preferred_width()
-                _, snh = slb.get_preferred_height()
-                s_angle = sl_data['angle']
-                s_pos = self._get_label_pos(snw, snh, s_angle, self.radius, gap=66, button_radius=24)
-                self.fixed.move(slb, s_pos[0], s_pos[1])
+            pos = self._get_label_pos(nw, nh, *_SLOT_GEOM[i], self.radius, gap=label_data['gap'], button_radius=24)
+            moves.append((lb, pos[0], pos[1]))
+            moves.extend(self._sub_label_moves(label_data))
+        
+        for widget, x, y in moves:
+            self._move_child(widget, x, y)
+
+    def _has_sub_actions(self, data):
+        # Mirrors the selection in _rebuild_sub_buttons without building anything
+        return bool(data.get("sub_buttons")) or data.get("action") in self.sub_action_map
 
     def _rebuild_sub_buttons(self, index, data):
-        """Destroys existing and creates new sub-buttons for a given slot index"""
+        """Updates the sub-buttons of a slot, re-creating widgets only if their count changes"""
         label_data = self.all_label_data[index]
         
-        # 1. Cleanup existing sub-buttons
-        for sb in label_data.get('sd', []):
-            sb.destroy()
-        for sl_data in label_data.get('sl', []):
-            sl_data['lb'].destroy()
-            
-        label_data['sd'] = []
-        label_data['sl'] = []
-        
-        # 2. Check if new action has sub-buttons
+        # Check if new action has sub-buttons
         action_key = data.get("action")
         
         # Build normalized sub_actions list
@@ -337,92 +505,111 @@ class quickeyWindow(Handy.ApplicationWindow):
              for icon, act_key, lbl in self.sub_action_map[action_key]:
                  sub_actions.append((icon, act_key, lbl))
         
-        if sub_actions:
-            center_x, center_y = 300, 300
-            outer_radius = 160
-            
-            # Calculate angle based on index (same logic as setup_ring_menu)
-            angle = (index * (360 / 8) - 90) * (math.pi / 180)
+        # Same number of sub-buttons: positions are identical, so just update the existing widgets
+        existing = label_data.get('sd', [])
+        if sub_actions and len(existing) == len(sub_actions):
+            for sb, sl_data, (icon, action_payload, label_text) in zip(existing, label_data['sl'], sub_actions):
+                self._set_button_icon(sb, self._map_legacy_icon(icon), 16)
+                sb._sub_data = self._sub_payload(action_payload)
+                sl_data['lb']._label.set_text(label_text)
+                sl_data['text'] = label_text
+            if self._labels_placed:
+                self._position_sub_labels(label_data)
+            return
+        
+        # Structural change: cleanup existing sub-buttons
+        for sb in existing:
+            sb.destroy()
+        for sl_data in label_data.get('sl', []):
+            sl_data['lb'].destroy()
             
-            count = len(sub_actions)
-            # Dynamic centered spacing
-            spacing = 20 # Degrees between buttons
-            total_spread = (count - 1) * spacing
-            start_offset = -total_spread / 2
+        label_data['sd'] = []
+        label_data['sl'] = []
+        
+        if sub_actions:
+            # Dynamic centered spacing around the parent slot
+            sub_geom = _sub_button_geom(index, len(sub_actions))
             
             for j, (icon, action_payload, label_text) in enumerate(sub_actions):
                 sb = Gtk.Button()
-                sb.get_style_context().add_class("sub-button") 
-                sb.get_style_context().add_class("hidden")
-                
-                # Legacy mapping: If user config has old names, map to new names
-                icon_map = {
-                    "grab-area-symbolic": "quickey-grab-area",
-                    "grab-window-symbolic": "quickey-grab-window", 
-                    "grab-screen-symbolic": "quickey-grab-screen"
-                }
-                final_icon = icon_map.get(icon, icon)
+                sb._sctx = sb.get_style_context()
+                sb._sctx.add_class("sub-button") 
+                sb._sctx.add_class("hidden")
                 
-                sb.set_image(Gtk.Image.new_from_icon_name(final_icon, Gtk.IconSize.MENU))
+                self._set_button_icon(sb, self._map_legacy_icon(icon), 16)
                 sb.set_size_request(30, 30) 
                 
-                # IMPORTANT: Pass action_payload (either dict or string)
-                # We need to wrap string in dict for the new handler if it is from built-ins
-                final_data = action_payload
-                if isinstance(action_payload, str):
-                    final_data = {"action": action_payload, "type": "internal" if "screenshot" in action_payload or "Previous" in action_payload else "command"} 
-                    # Note: Existing built-ins (Previous/Next) are handled by specific string checks in on_sub_button_clicked
-                    # so passing the raw string as 'action' in a dict works best for compatibility if we adjust handler.
-                    final_data = {"action": action_payload} 
-
-                sb.connect("clicked", self.on_sub_button_clicked, final_data)
+                # Payload is read from the widget so it can be swapped without reconnecting
+                sb._sub_data = self._sub_payload(action_payload)
+                sb.connect("clicked", self.on_sub_button_clicked)
                 
-                sa = angle + (start_offset + j * spacing) * math.pi / 180
-                sx = center_x + outer_radius * math.cos(sa)
-                sy = center_y + outer_radius * math.sin(sa)
+                sx, sy, s_geom = sub_geom[j]
                 
                 # Position center of sub-button
                 # 30px size -> offset 15
-                self.fixed.put(sb, int(sx - 15), int(sy - 15))
-                sb.show() # Ensure widget is realized/visible (CSS 'hidden' still applies)
+                self._put_child(sb, int(sx - 15), int(sy - 15))
                 label_data['sd'].append(sb)
                 
                 # Create Label
                 sub_lb = self._create_label(label_text)
-                self.fixed.put(sub_lb, 0, 0) # Will be positioned by refresh_button_ui
-                sub_lb.show_all() # Ensure label is visible (CSS controls opacity)
-                label_data['sl'].append({'lb': sub_lb, 'angle': sa})
+                
+                # During setup everything is shown at once by setup_ring_menu;
+                # later rebuilds must show their new widgets (CSS still controls opacity).
+                # Show before placing: a hidden Gtk.Label adds nothing to the box's size
+                if self.fixed.get_visible():
+                    sb.show_all()
+                    sub_lb.show_all()
+                self._put_sub_label(sub_lb, label_text, s_geom)
+                label_data['sl'].append({'lb': sub_lb, 'text': label_text, 'geom': s_geom})
 
                 # Connect hover events
-                # We need references to the main label and THIS sub label
-                main_lb = label_data['lb']
-                main_btn = label_data['btn']
-                
-                # We use a closure but need to be careful with binding
-                # Using functools.partial or default args is safer, but inner execution
-                # contexts in python hold 'sb' and 'sub_lb' correctly if defined here.
-                
-                def on_sub_enter(widget, event, _main_lb=main_lb, _this_sub_lb=sub_lb, _main_btn=main_btn):
-                    _main_lb.get_style_context().remove_class("visible")
-                    _this_sub_lb.get_style_context().add_class("visible")
-                    
-                    # Keep main button highlighted
-                    _main_btn.get_style_context().add_class("active-parent")
-                    
-                def on_sub_leave(widget, event, _main_lb=main_lb, _this_sub_lb=sub_lb, _main_btn=main_btn):
-                    _this_sub_lb.get_style_context().remove_class("visible")
-                    # Do NOT remove active-parent here. Rely on main exit timeout.
-                    
-                    # Debounce restoring main label (already exists, keeping it separate for now)
-                    GLib.timeout_add(50, self._check_restore_label, _main_lb, _main_btn)
-                    
-                sb.connect("enter-notify-event", on_sub_enter)
-                sb.connect("leave-notify-event", on_sub_leave)
+                # The handlers find the main label/button and THIS sub label on the widget
+                sb._sub_lb = sub_lb
+                sb._slot = label_data
+                sb.connect("enter-notify-event", self._on_sub_enter)
+                sb.connect("leave-notify-event", self._on_sub_leave)
+
+    def _on_sub_enter(self, widget, event):
+        label_data = widget._slot
+        label_data['lb']._sctx.remove_class("visible")
+        widget._sub_lb._sctx.add_class("visible")
+        
+        # Keep main button highlighted
+        label_data['btn']._sctx.add_class("active-parent")
+
+    def _on_sub_leave(self, widget, event):
+        label_data = widget._slot
+        main_lb, main_btn = label_data['lb'], label_data['btn']
+        widget._sub_lb._sctx.remove_class("visible")
+        # Do NOT remove active-parent here. Rely on main exit timeout.
+        
+        # Restore main label once GTK has processed the matching enter-event;
+        # a single pending check covers a burst of leaves
+        if self._restore_source == 0:
+            self._restore_source = GLib.idle_add(self._check_restore_label, main_lb, main_btn, priority=GLib.PRIORITY_DEFAULT_IDLE)
+
+    @staticmethod
+    def _map_legacy_icon(icon):
+        # Legacy mapping: If user config has old names, map to new names
+        icon_map = {
+            "grab-area-symbolic": "quickey-grab-area",
+            "grab-window-symbolic": "quickey-grab-window", 
+            "grab-screen-symbolic": "quickey-grab-screen"
+        }
+        return icon_map.get(icon, icon)
+
+    @staticmethod
+    def _sub_payload(action_payload):
+        # User sub-buttons carry their own dict. Built-ins (Previous/Next, screenshot_*)
+        # are plain strings handled by specific string checks in on_sub_button_clicked,
+        # so wrap them as {'action': ...}
+        if isinstance(action_payload, str):
+            return {"action": action_payload}
+        return action_payload
 
     def _check_restore_label(self, main_lb, main_btn):
-        # Find label_data for this main_lb
-        # Optimization: Pass label_data in if possible, but search is cheap for 8 items
-        label_data = next((item for item in self.all_label_data if item['lb'] == main_lb), None)
+        self._restore_source = 0
+        label_data = self._lb_to_data.get(id(main_lb))
         any_sub_hovered = False
         if label_data:
             for sub_btn in label_data['sd']:
@@ -433,20 +620,30 @@ class quickeyWindow(Handy.ApplicationWindow):
         main_hovered = main_btn.get_state_flags() & Gtk.StateFlags.PRELIGHT
         
         if not any_sub_hovered and main_hovered:
-            main_lb.get_style_context().add_class("visible")
+            main_lb._sctx.add_class("visible")
             
         return False
 
     def setup_ring_menu(self):
         items_data = self.load_configured_buttons()
         
-        center_x = 300
-        center_y = 300
+        center_x = _WINDOW_HALF
+        center_y = _WINDOW_HALF
         radius = self.radius 
         
+        self._label_size_cache = {}
+        self._labels_placed = False # set by the first reposition_all_labels
+        self._lb_to_data = {} # id(label box) -> label data
+        self._visible_idx = -1 # slot whose label/sub-buttons are currently shown
+        self._icon_cache = {} # (icon name, size) -> cairo surface at the window scale, False if not in theme
+        self._icon_theme = Gtk.IconTheme.get_default()
+        self._icon_theme_handler_id = self._icon_theme.connect("changed", self._on_icon_theme_changed)
+        self._scale_handler_id = self.connect("notify::scale-factor", self._on_icon_theme_changed)
+        
         # Center Close Button
         close_btn = Gtk.Button()
-        close_btn.get_style_context().add_class("center-button")
+        close_btn._sctx = close_btn.get_style_context()
+        close_btn._sctx.add_class("center-button")
         close_icon = Gtk.Image.new_from_icon_name("window-close-symbolic", Gtk.IconSize.MENU)
         close_btn.set_image(close_icon)
         close_btn.set_always_show_image(True)
@@ -454,7 +651,7 @@ class quickeyWindow(Handy.ApplicationWindow):
         close_btn.set_size_request(40, 40)
         close_btn.connect("clicked", lambda x: self.animate_quit())
         # Use Fixed for absolute centering instead of Overlay
-        self.fixed.put(close_btn, center_x - 20, center_y - 20)
+        self._put_child(close_btn, center_x - 20, center_y - 20)
         self.close_btn = close_btn
         
         # Define sub-action map once
@@ -475,71 +672,72 @@ class quickeyWindow(Handy.ApplicationWindow):
             ]
         }
 
-        num_items = len(items_data)
+
         for i, data in enumerate(items_data):
             name = data.get("name", "Unknown")
-            icon_name = data.get("icon", "system-run-symbolic")
             
-            angle = (i * (360 / num_items) - 90) * (math.pi / 180)
-            x, y = center_x + radius * math.cos(angle), center_y + radius * math.sin(angle)
+            dx, dy, _ = _SLOT_GEOM[i]
+            x, y = center_x + radius * dx, center_y + radius * dy
             
             btn = Gtk.Button()
-            btn.get_style_context().add_class("ring-button")
-            btn.get_style_context().add_class("hidden")
-            icon = Gtk.Image.new_from_icon_name(icon_name, Gtk.IconSize.MENU)
-            icon.set_pixel_size(24)
-            btn.set_image(icon)
+            btn._sctx = btn.get_style_context()
+            btn._sctx.add_class("ring-button")
+            btn._sctx.add_class("hidden")
+            # Icon is set by refresh_button_ui below
             btn.set_always_show_image(True)
             btn.set_size_request(48, 48)
-            btn._action_data = data
             btn.connect("clicked", self.on_button_clicked)
             
             # Position calculations: center of btn should be at (x, y)
             # Offset by half of 48px
-            self.fixed.put(btn, int(x - 24), int(y - 24))
+            self._put_child(btn, int(x - 24), int(y - 24))
             self.ring_buttons.append(btn)
             
             # Store for global hiding
             label_box = self._create_label(name)
             
             # Initial Setup
-            self.fixed.put(label_box, 0, 0)
+            self._put_child(label_box, 0, 0)
             
             # Store widgets for easy access
             this_label_data = {
                 'lb': label_box, 
                 'btn': btn,
                 'sd': [], # sub-buttons
-                'sl': []  # sub-button labels
+                'sl': [], # sub-button labels
+                'sd_built': False # sub-buttons are created on first hover
             }
             self.all_label_data.append(this_label_data)
-            
-            # Generate sub-buttons (reusing the new helper)
-            self._rebuild_sub_buttons(i, data)
+            self._lb_to_data[id(label_box)] = this_label_data
 
             # New hover logic for main button
-            def on_btn_enter(widget, event, lb, label_data, this_btn=btn):
-                # 1. Hide all other elements
-                for item in self.all_label_data:
-                    item['lb'].get_style_context().remove_class("visible")
-                    
-                    # Force remove active-parent from ALL other buttons to fix persistence bug
-                    if item['btn'] != this_btn:
-                         item['btn'].get_style_context().remove_class("active-parent")
-                         if hasattr(item['btn'], "_highlight_timeout") and item['btn']._highlight_timeout:
-                             GLib.source_remove(item['btn']._highlight_timeout)
-                             item['btn']._highlight_timeout = None
-                    
-                    for sb in item['sd']:
-                        sb.get_style_context().add_class("hidden")
-                    for sl_data in item.get('sl', []):
-                        sl_data['lb'].get_style_context().remove_class("visible")
-                        
-                lb.get_style_context().add_class("visible")
+            def on_btn_enter(widget, event, lb, label_data, index=i, this_btn=btn):
+                # Most slots are never hovered, so their sub-buttons are only built on demand
+                just_built = not label_data['sd_built']
+                if just_built:
+                    label_data['sd_built'] = True
+                    self._rebuild_sub_buttons(index, this_btn._action_data)
+                
+                # 1. Hide the previously shown slot; only one slot is ever expanded
+                if self._visible_idx not in (-1, index):
+                    prev = self.all_label_data[self._visible_idx]
+                    # Force remove active-parent from the other button to fix persistence bug
+                    prev['btn']._sctx.remove_class("active-parent")
+                    self._collapse_slot(prev)
+                self._visible_idx = index
+                
+                for sl_data in label_data['sl']:
+                    sl_data['lb']._sctx.remove_class("visible")
+                lb._sctx.add_class("visible")
                 
                 # Show sub-buttons for THIS button
-                for sb in label_data['sd']:
-                    sb.get_style_context().remove_class("hidden")
+                if just_built and label_data['sd']:
+                    # Fresh widgets have no style to transition from; reveal them once
+                    # a frame has drawn them hidden so the first expand fades in too
+                    self.add_tick_callback(self._reveal_new_subs, [index, 0])
+                else:
+                    for sb in label_data['sd']:
+                        sb._sctx.remove_class("hidden")
                     
             def on_btn_leave(widget, event, lb, main_btn):
                 GLib.timeout_add(400, self._maybe_hide_refined_v5, lb, None, main_btn)
@@ -549,15 +747,41 @@ class quickeyWindow(Handy.ApplicationWindow):
             btn.connect("enter-notify-event", on_btn_enter, label_box, this_label_data)
             btn.connect("leave-notify-event", on_btn_leave, label_box, btn)
             
-            # Initial positioning
+            # Initial positioning (also generates sub-buttons)
             self.refresh_button_ui(i, data)
+        
+        # Quit animation order: counter-clockwise starting from 12 o'clock
+        # (0, 7, 6, 5, 4, 3, 2, 1), then the close button
+        num = len(self.ring_buttons)
+        self._hide_order = (0,) + tuple(range(num - 1, 0, -1)) if num else ()
+        
+        # Realize the whole ring in one pass; labels are re-measured on map
+        self.overlay.show_all()
+
+    def _reveal_new_subs(self, widget, frame_clock, state):
+        # state is [slot index, ticks seen]; the first tick precedes the hidden frame
+        state[1] += 1
+        if state[1] < 2:
+            return True
+        index = state[0]
+        if self._visible_idx == index and not self.is_quitting:
+            for sb in self.all_label_data[index]['sd']:
+                sb._sctx.remove_class("hidden")
+        return False
+
+    def _collapse_slot(self, label_data):
+        label_data['lb']._sctx.remove_class("visible")
+        for sb in label_data['sd']:
+            sb._sctx.add_class("hidden")
+        for sl_data in label_data['sl']:
+            sl_data['lb']._sctx.remove_class("visible")
 
     def _maybe_hide_refined_v5(self, lb, rb, main_btn):
         # Check if mouse is still in main_btn OR sub-buttons
         is_hovered = main_btn.get_state_flags() & Gtk.StateFlags.PRELIGHT
         
         # Check sub-buttons
-        label_data = next((item for item in self.all_label_data if item['lb'] == lb), None)
+        label_data = self._lb_to_data.get(id(lb))
         if not is_hovered and label_data:
             for sb in label_data['sd']:
                 if sb.get_state_flags() & Gtk.StateFlags.PRELIGHT:
@@ -565,48 +789,53 @@ class quickeyWindow(Handy.ApplicationWindow):
                     break
 
         if not is_hovered:
-            lb.get_style_context().remove_class("visible")
             # Clear parent highlight when truly leaving interaction group
-            main_btn.get_style_context().remove_class("active-parent")
+            main_btn._sctx.remove_class("active-parent")
             
             if label_data:
-                for sb in label_data['sd']:
-                    sb.get_style_context().add_class("hidden")
-                for sl_data in label_data.get('sl', []):
-                    sl_data['lb'].get_style_context().remove_class("visible")
+                self._collapse_slot(label_data)
+                if self._visible_idx != -1 and self.all_label_data[self._visible_idx] is label_data:
+                    self._visible_idx = -1
+            else:
+                lb._sctx.remove_class("visible")
             if rb:
                 rb.get_style_context().remove_class("visible")
                 rb.set_visible(False)
         return False
 
     def animate_launch(self):
-        # Micro-Optimization 1: Disable GC to prevent stutters
-        gc.disable()
-        
         start_time = None
         duration_us = 450 * 1000 
         num_items = len(self.ring_buttons)
         if num_items == 0: 
-            gc.enable()
             return
+        
+        # Micro-Optimization 1: Freeze the existing heap so collections during the
+        # animation only scan new, short-lived objects instead of stalling a frame
+        gc.freeze()
             
         # Micro-Optimization 2: Pre-calculate constants and deltas
-        center_x, center_y = 300, 300
+        # Top-left of a 48px button centred on the ring, with +0.5 folded in so that
+        # int() truncation rounds to the nearest pixel (all coordinates are positive)
+        origin_x = origin_y = _WINDOW_HALF - 24 + 0.5
         radius = self.radius
         start_angle = -math.pi / 2
         
         anim_targets = []
         for i, btn in enumerate(self.ring_buttons):
-            btn.get_style_context().remove_class("hidden")
-            btn.get_style_context().add_class("animating")
+            btn._sctx.remove_class("hidden")
+            btn._sctx.add_class("animating")
             
-            target_angle = (i * (360 / num_items) - 90) * (math.pi / 180)
-            delta = target_angle - start_angle
+            delta = _SLOT_ANGLES[i] - start_angle
             anim_targets.append((btn, delta))
+        
+        # Longest path any button travels, in pixels
+        max_arc = radius * max(abs(delta) for _, delta in anim_targets)
 
-        def cubic_ease_out(t):
-            return 1 - (1 - t) ** 3
-            
+        anim_targets = tuple(anim_targets)
+        cos, sin = math.cos, math.sin
+        move_child = self._move_child
+        
         def animation_tick(widget, frame_clock):
             nonlocal start_time
             now = frame_clock.get_frame_time()
@@ -616,30 +845,48 @@ class quickeyWindow(Handy.ApplicationWindow):
             elapsed = now - start_time
             proc = min(elapsed / duration_us, 1.0)
             
-            ease_val = cubic_ease_out(proc)
+            # Cubic ease-out: 1 - (1 - t)^3
+            remaining = (1 - proc) ** 3
+            # The ease-out tail moves every button by less than half a pixel;
+            # snap to the final layout instead of spending frames on it
+            if remaining * max_arc < 0.5:
+                proc = 1.0
+                remaining = 0.0
+            
+            ease_val = 1 - remaining
             
             for btn, delta in anim_targets:
                 curr_angle = start_angle + delta * ease_val
                 
-                x = center_x + radius * math.cos(curr_angle)
-                y = center_y + radius * math.sin(curr_angle)
-                
                 # Micro-Optimization 3: Rounding for stability
-                self.fixed.move(btn, int(round(x - 24)), int(round(y - 24)))
+                move_child(btn, int(origin_x + radius * cos(curr_angle)), int(origin_y + radius * sin(curr_angle)))
                 
             if proc < 1.0:
                 return True 
             else:
                 # Cleanup
                 for btn in self.ring_buttons:
-                    btn.get_style_context().remove_class("animating")
-                gc.enable() # Re-enable GC
+                    btn._sctx.remove_class("animating")
+                gc.unfreeze()
+                gc.collect(0) # Clear the frames' short-lived garbage
                 return False 
                 
         self.add_tick_callback(animation_tick)
 
+    def _needs_pointer_sync(self):
+        # XWayland only learns the pointer position while the pointer is over one of
+        # its surfaces. A plain X11 session reports it directly, and the Wayland
+        # backend has no global position that a sync window could refresh.
+        if not self._is_x11:
+            return False
+        return os.environ.get("XDG_SESSION_TYPE") == "wayland" or "WAYLAND_DISPLAY" in os.environ
+
     @log_function_calls
     def reposition_and_present(self):
+        if not self._needs_pointer_sync():
+            self._finalize_reposition(None)
+            return False
+        
         # Stealth Sync Strategy (Optimized)
         logger.info("Triggering Stealth Pointer Sync...")
         
@@ -651,46 +898,79 @@ class quickeyWindow(Handy.ApplicationWindow):
         sync_window.set_opacity(0.0)
         sync_window.set_accept_focus(False)
         
-        provider = Gtk.CssProvider()
-        provider.load_from_data(b"window { background: transparent; }")
-        sync_window.get_style_context().add_provider(provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+        cls = type(self)
+        if cls._sync_css_provider is None:
+            cls._sync_css_provider = Gtk.CssProvider()
+            cls._sync_css_provider.load_from_data(b"window { background: transparent; }")
+        sync_window.get_style_context().add_provider(cls._sync_css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
         
         # Cover all monitors to be safe
         sync_window.set_default_size(screen.get_width() + 1000, screen.get_height() + 1000)
         sync_window.move(-500, -500)
         
+        # XWayland knows the pointer position as soon as the pointer is inside the sync
+        # window, which X reports as an enter on map; the timeout is only a fallback
+        sync_window.add_events(Gdk.EventMask.ENTER_NOTIFY_MASK)
+        sync_window.connect("enter-notify-event", self._on_sync_window_entered)
         sync_window.show() 
         
         # Reduced delay (80ms) - slightly bumped for empty desktop reliability
-        GLib.timeout_add(80, self._finalize_reposition, sync_window)
+        sync_window._sync_timeout = GLib.timeout_add(80, self._finalize_reposition, sync_window)
         return False
 
+    def _on_sync_window_entered(self, sync_window, event):
+        GLib.source_remove(sync_window._sync_timeout)
+        self._finalize_reposition(sync_window)
+        return True
+
     def _finalize_reposition(self, sync_window):
         # Sync complete, capture the TRUE global position
-        display = Gdk.Display.get_default()
-        root_window = display.get_default_screen().get_root_window()
-        client_pointer = display.get_device_manager().get_client_pointer()
-        _, root_x, root_y, _ = root_window.get_device_position(client_pointer)
+        if self._pointer:
+            _, root_x, root_y = self._pointer.get_position()
+        else:
+            logger.error("Could not get pointer, centering on the screen")
+            screen = self._display.get_default_screen()
+            root_x, root_y = screen.get_width() // 2, screen.get_height() // 2
         
         self.target_x, self.target_y = root_x, root_y
-        logger.info(f"Sync Complete. Actual Target: ({self.target_x}, {self.target_y})")
+        logger.info("Sync Complete. Actual Target: (%d, %d)", self.target_x, self.target_y)
 
-        sync_window.destroy()
+        if sync_window:
+            sync_window.destroy()
 
-        # Place the real window
-        self.reposition_to_cursor(self.target_x, self.target_y)
+        # Place the real window before it is mapped
+        self._move_to_pointer(self.target_x, self.target_y)
         self.show_all()
         # Final presentation
         Gdk.notify_startup_complete()
         self.present()
         
-        # WM placement fixups
-        GLib.timeout_add(40, self.reposition_to_cursor, self.target_x, self.target_y)
-        GLib.timeout_add(200, self.reposition_to_cursor, self.target_x, self.target_y)
+        # WM placement fixups: correct the position whenever the WM configures the
+        # window elsewhere, plus one pass once the startup events have drained.
+        # Only X11 reports a position that can be compared against the placement.
+        self._stop_placement_fixups()
+        if self._is_x11:
+            self._placement_fixups = 3
+            self._configure_handler_id = self.connect("configure-event", self._on_configure_event)
+        self.reposition_to_cursor(self.target_x, self.target_y)
         
         self.animate_launch()
         return False
 
+    def _on_configure_event(self, widget, event):
+        self._placement_fixups -= 1
+        # Stop watching once the WM honoured the placement (or keeps overriding it)
+        if self.get_position() == self._placed_pos or self._placement_fixups <= 0:
+            self._stop_placement_fixups()
+        else:
+            self.move(*self._placed_pos)
+        return False
+
+    def _stop_placement_fixups(self):
+        if self._configure_handler_id is not None:
+            self.disconnect(self._configure_handler_id)
+            self._configure_handler_id = None
+
     def _on_map_event(self, widget, event):
         if self.map_handler_id:
             self.disconnect(self.map_handler_id)
@@ -699,7 +979,7 @@ class quickeyWindow(Handy.ApplicationWindow):
         # Recalculate positions now that CSS is fully loaded
         self.reposition_all_labels()
 
-        if hasattr(self, 'target_x'):
+        if self.target_x is not None:
             self.reposition_to_cursor(self.target_x, self.target_y)
         return False
 
@@ -708,139 +988,228 @@ class quickeyWindow(Handy.ApplicationWindow):
             self.disconnect(self.draw_handler_id)
             self.draw_handler_id = None
             
-        if hasattr(self, 'target_x'):
+        if self.target_x is not None:
             self.reposition_to_cursor(self.target_x, self.target_y)
         return False
 
     def reposition_to_cursor(self, forced_x=None, forced_y=None):
-        display = Gdk.Display.get_default()
-        if not display:
-            logger.error("Could not get default display")
-            return
-            
+        # Map, draw and the startup fixup can all ask within the same loop turn;
+        # collapse them into a single move
+        self._pending_pos = (forced_x, forced_y)
+        if not self._reposition_pending:
+            self._reposition_pending = True
+            GLib.idle_add(self._do_reposition, priority=GLib.PRIORITY_HIGH_IDLE)
+        return False
+
+    def _do_reposition(self):
+        self._reposition_pending = False
+        self._move_to_pointer(*self._pending_pos)
+        return False
+
+    def _move_to_pointer(self, forced_x=None, forced_y=None):
+        display = self._display
         if forced_x is not None and forced_y is not None:
             x, y = forced_x, forced_y
         else:
-            seat = display.get_default_seat()
-            if not seat:
-                logger.error("Could not get default seat")
-                return
-                
-            pointer = seat.get_pointer()
-            if not pointer:
+            if not self._pointer:
                 logger.error("Could not get pointer")
                 return
                 
-            screen, x, y = pointer.get_position()
-            logger.info(f"Retrieved fresh cursor position: ({x}, {y})")
-        
-        # Adjusted window size for better boundary management
-        width = 600
-        height = 600
-        
-        logger.debug(f"Window sizing for positioning: {width}x{height}")
+            screen, x, y = self._pointer.get_position()
+            logger.info("Retrieved fresh cursor position: (%d, %d)", x, y)
         
         # Center the window at the cursor
-        target_x = x - (width // 2)
-        target_y = y - (height // 2)
+        target_x = x - _WINDOW_HALF
+        target_y = y - _WINDOW_HALF
         
         # Get monitor for this position to handle boundaries
-        monitor = display.get_monitor_at_point(x, y)
-        if monitor:
-            geometry = monitor.get_geometry()
-            logger.debug(f"Monitor geometry: {geometry.x, geometry.y, geometry.width, geometry.height}")
+        rect = self._monitor_rect_at(x, y)
+        if rect:
+            gx, gy, gw, gh = rect
+            logger.debug("Monitor geometry: (%d, %d, %d, %d)", gx, gy, gw, gh)
             
-            target_x = max(geometry.x, min(target_x, geometry.x + geometry.width - width))
-            target_y = max(geometry.y, min(target_y, geometry.y + geometry.height - height))
+            target_x = max(gx, min(target_x, gx + gw - _WINDOW_SIZE))
+            target_y = max(gy, min(target_y, gy + gh - _WINDOW_SIZE))
 
+        # Already placed there and the WM kept it: a repeat move would only send
+        # another ConfigureRequest
+        target = (target_x, target_y)
+        if target == self._placed_pos and self.get_position() == target:
+            return
+        
         # logger.info(f"Forcing move to target: ({target_x}, {target_y})")
         self.move(target_x, target_y)
-        
-        self.set_keep_above(True)
+        self._placed_pos = target
         
         # Verify if move was respected in the next main loop iteration
-        if logger.isEnabledFor(logging.DEBUG):
-            def log_pos():
-                if self.get_window():
-                    logger.debug(f"Current reported window position: {self.get_position()}")
-                return False
-            GLib.idle_add(log_pos)
+        if _TRACE_POS and logger.isEnabledFor(logging.DEBUG):
+            GLib.idle_add(self._log_position)
+
+    def _monitor_rect_at(self, x, y):
+        """Returns (x, y, width, height) of the monitor containing the point, or None"""
+        if self._monitor_rects is None:
+            display = self._display
+            geometries = (display.get_monitor(i).get_geometry() for i in range(display.get_n_monitors()))
+            self._monitor_rects = [(g.x, g.y, g.width, g.height) for g in geometries]
         
-        return False # For timeout_add
+        for rect in self._monitor_rects:
+            gx, gy, gw, gh = rect
+            if gx <= x < gx + gw and gy <= y < gy + gh:
+                return rect
+        
+        # Outside every monitor (e.g. a stale position): GDK picks the nearest one
+        monitor = self._display.get_monitor_at_point(x, y)
+        if monitor:
+            g = monitor.get_geometry()
+            return (g.x, g.y, g.width, g.height)
+        return None
+
+    def _log_position(self):
+        if self.get_window():
+            logger.debug("Current reported window position: %s", self.get_position())
+        return False
 
     def _on_focus_out(self, widget, event):
         if self.is_quitting or getattr(self, "is_configuring", False):
             logger.info("Focus lost but quitting or configuring, ignoring.")
             return False
             
-        # Check if focus moved to another window of the same app (like Preferences)
-        def check_focus():
-            # If we already destroyed/quitting, bail
-            if self.is_quitting:
-                return False
+        # Check once GTK has processed the focus change whether focus moved to
+        # another window of the same app (like Preferences)
+        GLib.idle_add(self._check_focus_lost)
+        return False
 
-            active_window = self.app.get_active_window()
-            # If any window in the app is PreferencesWindow, don't quit the ring
-            all_windows = self.app.get_windows()
-            has_preferences = any(w.__class__.__name__ == "PreferencesWindow" for w in all_windows)
-            
-            if has_preferences:
-                logger.info("Preferences window exists. Keeping ring menu.")
-                return False
+    def _check_focus_lost(self):
+        # If we already destroyed/quitting, bail
+        if self.is_quitting:
+            return False
 
-            if active_window and active_window != self:
-                logger.info(f"Focus moved to internal window: {active_window.get_title()}. Keeping ring.")
-                return False
-            
-            logger.info("Focus lost to external app, quitting with animation...")
-            self.animate_quit()
+        # If the app has a PreferencesWindow, don't quit the ring
+        if self._has_preferences:
+            logger.info("Preferences window exists. Keeping ring menu.")
             return False
 
-        # Small delay to let active_window update
-        GLib.timeout_add(150, check_focus)
+        active_window = self.app.get_active_window()
+        if active_window and active_window != self:
+            logger.info("Focus moved to internal window: %s. Keeping ring.", active_window.get_title())
+            return False
+        
+        logger.info("Focus lost to external app, quitting with animation...")
+        self.animate_quit()
         return False
 
+    def _on_app_windows_changed(self, app, window):
+        self._has_preferences = any(isinstance(w, PreferencesWindow) for w in app.get_windows())
+
+    def _on_destroy(self, widget):
+        for handler_id in self._app_handler_ids:
+            self.app.disconnect(handler_id)
+        self._app_handler_ids = ()
+        for handler_id in self._display_handler_ids:
+            self._display.disconnect(handler_id)
+        self._display_handler_ids = ()
+        if self._screen_handler_id:
+            self._screen.disconnect(self._screen_handler_id)
+            self._screen_handler_id = 0
+        if self._icon_theme_handler_id:
+            self._icon_theme.disconnect(self._icon_theme_handler_id)
+            self._icon_theme_handler_id = 0
+        if self._scale_handler_id:
+            self.disconnect(self._scale_handler_id)
+            self._scale_handler_id = 0
+        self.action_handler.shutdown()
+
+    def _on_monitors_changed(self, screen):
+        self._monitor_rects = None
+
+    def _update_pointer(self, *args):
+        seat = self._display.get_default_seat()
+        self._pointer = seat.get_pointer() if seat else None
+
     def _on_button_press(self, widget, event):
         # This will be called if no child (like a button) handled the press
         # or if the click was on empty space within the 600x600 window
+        if self.is_quitting:
+            return True
         logger.info("Click on empty space, quitting with animation...")
         self.animate_quit()
-        return False
+        return True
 
 
     def animate_quit(self, should_quit_app=True):
         if self.is_quitting:
             logger.info("animate_quit called but already in progress.")
             return
-        logger.info(f"animate_quit(should_quit_app={should_quit_app}) started.")
+        logger.info("animate_quit(should_quit_app=%s) started.", should_quit_app)
         self.is_quitting = True
         self.set_sensitive(False) # Prevent further clicks
 
-        def hide_button(indices):
-            if indices:
-                idx = indices.pop(0)
-                self.ring_buttons[idx].get_style_context().add_class("hidden")
-                # Hide sub-buttons too
-                for sb in self.all_label_data[idx]['sd']:
-                    sb.get_style_context().add_class("hidden")
-                for sl_data in self.all_label_data[idx].get('sl', []):
-                    sl_data['lb'].get_style_context().remove_class("visible")
-                GLib.timeout_add(25, hide_button, indices)
-            else:
-                self.close_btn.get_style_context().add_class("hidden")
-                if should_quit_app:
-                    logger.info("Sheduling app.quit")
-                    GLib.timeout_add(120, self.app.quit)
-                else:
-                    logger.info("Scheduling self.destroy (app should stay alive)")
-                    GLib.timeout_add(120, self.destroy)
-            return False
-
         num = len(self.ring_buttons)
-        if num > 0:
-            # Counter-clockwise starting from 12 o'clock (index 0)
-            # 0, 7, 6, 5, 4, 3, 2, 1
-            indices = [0] + list(range(num - 1, 0, -1))
-            hide_button(indices)
-        else:
+        if num == 0:
+            self.app.quit()
+            return
+        
+        order = self._hide_order
+        expanded = self._visible_idx
+        
+        if not self.get_mapped():
+            # Nothing on screen to animate (e.g. hidden for a screenshot) and
+            # tick callbacks only run while mapped
+            self._finish_quit(should_quit_app)
+            return
+        
+        # Resolve every style context up front so the tick only flips classes.
+        # Only the expanded slot can have sub-buttons showing.
+        plan = []
+        for idx in order:
+            subs, sub_labels = (), ()
+            if idx == expanded:
+                label_data = self.all_label_data[idx]
+                subs = tuple(sb._sctx for sb in label_data['sd'])
+                sub_labels = tuple(sl_data['lb']._sctx for sl_data in label_data['sl'])
+            plan.append((self.ring_buttons[idx]._sctx, subs, sub_labels))
+        close_ctx = self.close_btn._sctx
+        
+        start_time = None
+        close_time = None
+        step = 0
+        
+        def hide_tick(widget, frame_clock):
+            nonlocal start_time, close_time, step
+            now = frame_clock.get_frame_time()
+            if start_time is None:
+                start_time = now
+            
+            if close_time is not None:
+                # Let the close button's CSS transition finish (120ms) before going away
+                if now - close_time < 120000:
+                    return True
+                GLib.idle_add(self._finish_quit, should_quit_app)
+                return False
+            
+            # One more element every 25ms, driven by the frame clock
+            due = min((now - start_time) // 25000 + 1, num + 1)
+            while step < due:
+                if step == num:
+                    close_ctx.add_class("hidden")
+                    close_time = now
+                    return True
+                btn_ctx, sub_ctxs, sub_label_ctxs = plan[step]
+                btn_ctx.add_class("hidden")
+                for ctx in sub_ctxs:
+                    ctx.add_class("hidden")
+                for ctx in sub_label_ctxs:
+                    ctx.remove_class("visible")
+                step += 1
+            return True
+        
+        self.add_tick_callback(hide_tick)
+
+    def _finish_quit(self, should_quit_app):
+        if should_quit_app:
+            logger.info("Quitting app")
             self.app.quit()
+        else:
+            logger.info("Destroying ring window (app should stay alive)")
+            self.destroy()
+        return False